@@ -2,18 +2,135 @@
 
 import sys
 import socket
+import logging
 import json
+import re
+import csv
+from collections import defaultdict
+
+try:
+    # orjson (extensão em C) é bem mais rápido para decodificar as respostas
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+log = logging.getLogger(__name__)
+
+RECV_SIZE = 8192
+STATUS_RE = re.compile(rb"HTTP/1\.(\d) (\d{3})")
+CONTENT_LENGTH_RE = re.compile(rb"\r\ncontent-length:[ \t]*(\d+)", re.IGNORECASE)
+CONNECTION_RE = re.compile(rb"\r\nconnection:[ \t]*([^\r]*)", re.IGNORECASE)
+PIPELINE_BATCH = 32  # quantas requisições /api/game enviar de uma vez
+BOARD_ROWS = range(8)  # rows válidas do tabuleiro para o histograma de canhões
+PROGRESS_EVERY = 10  # de quantos em quantos jogos mostrar o progresso (nível INFO)
+PIPELINE_PROBE_TIMEOUT = 0.25  # espera pela 2ª resposta ao testar se o servidor aceita pipelining
+MAX_RECONNECTS = 3  # quedas de conexão seguidas, sem nenhuma resposta nova, antes de desistir
+
+# cache de respostas /api/game já decodificadas: path -> dict
+_path_cache = {}
+
+def make_request_template(host):
+    """
+    monta uma vez o template (em bytes) da requisição GET HTTP/1.1 keep-alive
+    para 'host'; só falta preencher o path com: template % path_bytes
+    """
+    return (b"GET %b HTTP/1.1\r\nHost: " + host.encode("utf-8")
+            + b"\r\nConnection: keep-alive\r\n\r\n")
+
+def open_socket(host, port):
+    """
+    abre e conecta o socket TCP usado para falar com o servidor
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # sem Nagle: as requisições em pipeline saem imediatamente
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        sock.connect((host, port))
+    except Exception:
+        sock.close()
+        raise
+    return sock
+
+class BufferedConn:
+    """
+    socket + buffer de bytes já recebidos
+    lê do socket em blocos de RECV_SIZE e guarda o que sobrar para a próxima
+    resposta, já que a conexão keep-alive é reaproveitada entre requisições
+    guarda também o endereço, para poder refazer a conexão se ela cair
+    com pipeline=True as requisições podem ir em pipeline, se o servidor aceitar
+    """
+    def __init__(self, host, port, pipeline=False):
+        self.host = host
+        self.port = port
+        self.buf = bytearray()
+        self.request_template = make_request_template(host)
+        self.sock = open_socket(host, port)
+        # o servidor fechou (ou vai fechar) a conexão: reconectar antes do próximo envio
+        self.must_reconnect = False
+        # o servidor responde pedidos em pipeline? None enquanto não foi testado;
+        # sem pipeline=True nem testa e manda um pedido por vez
+        self.pipelining = None if pipeline else False
+
+    def reconnect(self):
+        """
+        descarta o socket atual (e o que sobrou no buffer) e conecta de novo
+        """
+        self.close()
+        self.buf.clear()
+        self.sock = open_socket(self.host, self.port)
+        self.must_reconnect = False
+
+    def close(self):
+        self.sock.close()
+
+    def read_until(self, sep):
+        """
+        retorna os bytes até 'sep' (exclusive), consumindo 'sep' do buffer
+        retorna None se a conexão for fechada antes de achar 'sep'
+        """
+        search_from = 0
+        while True:
+            idx = self.buf.find(sep, search_from)
+            if idx >= 0:
+                data = bytes(self.buf[:idx])
+                del self.buf[:idx + len(sep)]
+                return data
+            # 'sep' pode estar dividido entre o bloco antigo e o novo
+            search_from = max(0, len(self.buf) - len(sep) + 1)
+            chunk = self.sock.recv(RECV_SIZE)
+            if not chunk:
+                return None
+            self.buf += chunk
+
+    def read_exact(self, n):
+        """
+        retorna exatamente n bytes (ou menos, se a conexão for fechada antes)
+        """
+        while len(self.buf) < n:
+            chunk = self.sock.recv(max(n - len(self.buf), RECV_SIZE))
+            if not chunk:
+                break
+            self.buf += chunk
+        data = bytes(self.buf[:n])
+        del self.buf[:n]
+        return data
 
 def main():
     """
     uso:
-      ./client.py <IP> <port> <analysis> <output>
+      ./client.py <IP> <port> <analysis> <output> [--pipeline]
     onde:
       <analysis> = 1 ou 2
       <output> = nome do arquivo CSV de saída
+      --pipeline = envia as requisições em pipeline, se o servidor aceitar
     """
-    if len(sys.argv) != 5:
-        print("Uso: ./client.py <IP> <port> <analysis> <output>")
+    # mensagens por requisição ficam em DEBUG; por padrão só o progresso aparece
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if len(sys.argv) not in (5, 6) or (len(sys.argv) == 6 and sys.argv[5] != "--pipeline"):
+        log.error("Uso: ./client.py <IP> <port> <analysis> <output> [--pipeline]")
         sys.exit(1)
 
     host = sys.argv[1]
@@ -21,86 +138,99 @@ def main():
     try:
         analysis = int(sys.argv[3])
     except ValueError:
-        print("O parâmetro <analysis> deve ser um inteiro (1 ou 2).")
+        log.error("O parâmetro <analysis> deve ser um inteiro (1 ou 2).")
         sys.exit(1)
     output_file = sys.argv[4]
+    pipeline = len(sys.argv) == 6
 
     if analysis not in (1, 2):
-        print("O parâmetro <analysis> deve ser 1 ou 2.")
+        log.error("O parâmetro <analysis> deve ser 1 ou 2.")
         sys.exit(1)
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
     try:
-        print(f"Conectando ao servidor {host}:{port}...")
-        sock.connect((host, port))
-        print("Conexão estabelecida com sucesso.")
+        log.info("Conectando ao servidor %s:%d...", host, port)
+        conn = BufferedConn(host, port, pipeline)
+        log.info("Conexão estabelecida com sucesso.")
     except Exception as e:
-        print(f"Erro ao conectar ao servidor: {e}")
+        log.error("Erro ao conectar ao servidor: %s", e)
         sys.exit(1)
 
-    # obter a lista de até 100 jogos relevante ao analysis
-    if analysis == 1:
-        print("Iniciando Análise 1: Immortals (Top 100 ships_sunk)...")
-        # top 100 rank de 'sunk'
-        game_ids = get_top_n_games(sock, host, port, "sunk", 100)
-        print(f"Total de game_ids obtidos para Análise 1: {len(game_ids)}")
-        # análise Immortals
-        csv_lines = analysis_immortals(sock, host, port, game_ids)
-    else:  # analysis == 2
-        print("Iniciando Análise 2: Top Meta (Top 100 ships_escaped)...")
-        # top 100 rank de 'escaped'
-        game_ids = get_top_n_games(sock, host, port, "escaped", 100)
-        print(f"Total de game_ids obtidos para Análise 2: {len(game_ids)}")
-        # análise de cannon placement
-        csv_lines = analysis_top_meta(sock, host, port, game_ids)
-
-    # salvar o CSV sem cabeçalho
+    # o CSV (sem cabeçalho) é escrito direto pela análise, sem lista intermediária
     try:
-        with open(output_file, "w", encoding="utf-8") as f:
-            for line in csv_lines:
-                f.write(line + "\n")
-        print(f"Arquivo CSV '{output_file}' gerado com sucesso.")
+        f = open(output_file, "w", encoding="utf-8", newline="")
     except Exception as e:
-        print(f"Erro ao escrever no arquivo CSV: {e}")
+        log.error("Erro ao abrir o arquivo CSV: %s", e)
+        conn.close()
+        sys.exit(1)
+    try:
+        with f:
+            # sem aspas nem escape: os campos saem como estão, como no CSV montado
+            # à mão (vírgulas e quebras de linha já são removidas do 'auth')
+            writer = csv.writer(f, lineterminator="\n", quoting=csv.QUOTE_NONE,
+                                quotechar=None)
+
+            # obter a lista de até 100 jogos relevante ao analysis
+            if analysis == 1:
+                log.info("Iniciando Análise 1: Immortals (Top 100 ships_sunk)...")
+                # top 100 rank de 'sunk'
+                game_ids = get_top_n_games(conn, "sunk", 100)
+                log.info("Total de game_ids obtidos para Análise 1: %d", len(game_ids))
+                # análise Immortals
+                analysis_immortals(conn, game_ids, writer)
+            else:  # analysis == 2
+                log.info("Iniciando Análise 2: Top Meta (Top 100 ships_escaped)...")
+                # top 100 rank de 'escaped'
+                game_ids = get_top_n_games(conn, "escaped", 100)
+                log.info("Total de game_ids obtidos para Análise 2: %d", len(game_ids))
+                # análise de cannon placement
+                analysis_top_meta(conn, game_ids, writer)
+    except (OSError, csv.Error) as e:
+        log.error("Erro ao escrever no arquivo CSV: %s", e)
+        conn.close()
+        sys.exit(1)
 
-    sock.close()
-    print("Conexão encerrada.")
+    conn.close()
+    log.info("Conexão encerrada.")
+    log.info("Arquivo CSV '%s' gerado com sucesso.", output_file)
 
-def get_top_n_games(sock, host, port, ranking_type, n=100):
+def get_top_n_games(conn, ranking_type, n=100):
     """
     obtém até 'n' game_ids do ranking 'ranking_type' ('sunk' ou 'escaped'),
     verificando a API em páginas, pois cada página pode ter no máximo 50 results
     retorna uma lista de game_ids (no máximo n)
     """
     game_ids = []
-    start = 1
     limit = 50  # máximo permitido
 
-    while len(game_ids) < n:
-        print(f"Solicitando página com start={start}, limit={limit} para ranking '{ranking_type}'...")
+    # as páginas necessárias já são conhecidas (start de 50 em 50),
+    # então todas são pedidas juntas (em pipeline, com --pipeline)
+    starts = list(range(1, n + 1, limit))
+    paths = []
+    for start in starts:
+        log.debug("Solicitando página com start=%d, limit=%d para ranking '%s'...", start, limit, ranking_type)
         # montar a URL: /api/rank/sunk?limit=50&start=<start> (ou 'escaped')
-        path = f"/api/rank/{ranking_type}?limit={limit}&start={start}"
-        data = http_get(sock, host, port, path)
+        paths.append(f"/api/rank/{ranking_type}?limit={limit}&start={start}")
+    pages = http_pipeline(conn, paths)
+
+    for data in pages:
         if data is None:
-            print("Falha ao obter dados da API.")
+            log.warning("Falha ao obter dados da API.")
             break  # algum erro
 
         try:
-            parsed = json.loads(data)
-            print(f"Resposta recebida: {len(parsed.get('games', []))} jogos nesta página.")
+            parsed = json_loads(data)
+            log.debug("Resposta recebida: %d jogos nesta página.", len(parsed.get("games", [])))
         except json.JSONDecodeError:
-            print("Erro ao decodificar JSON da resposta.")
+            log.error("Erro ao decodificar JSON da resposta.")
             break
 
         if "games" not in parsed:
-            print("Campo 'games' não encontrado na resposta.")
+            log.error("Campo 'games' não encontrado na resposta.")
             break
 
         page_games = parsed["games"]
         if not page_games:
-            print("Nenhum jogo encontrado na página atual. Finalizando coleta de game_ids.")
+            log.debug("Nenhum jogo encontrado na página atual. Finalizando coleta de game_ids.")
             break
 
         for g in page_games:
@@ -110,120 +240,144 @@ def get_top_n_games(sock, host, port, ranking_type, n=100):
                 break
 
         if not parsed.get("next"):
-            print("Não há próxima página. Finalizando coleta de game_ids.")
+            log.debug("Não há próxima página. Finalizando coleta de game_ids.")
             break
 
-        # caso contrário, incrementar start de 50 em 50
-        start += limit
-
     return game_ids
 
-def http_get(sock, host, port, path):
+def http_pipeline(conn, paths):
     """
-    Envia uma requisição GET HTTP/1.1 para o socket 'sock'
-    e retorna o corpo da resposta (string) ou None em caso de erro
-
-    - manter a conexão aberta (HTTP/1.1)
-    - ler o 'Content-Length' e depois ler exatamente esse número de bytes do body
-    - o sock se mantém conectado, mas precisamos ter cuidado na hora de ler, pois
-    podem haver várias requisições/respostas no mesmo socket
+    envia as requisições GET de 'paths' pela conexão keep-alive e retorna uma
+    lista com o corpo (bytes) ou None de cada resposta, na ordem dos pedidos
+
+    por padrão vai um pedido por vez; com --pipeline, como nem todo servidor
+    responde pedidos em pipeline (o gunicorn gthread, por exemplo, só responde
+    o primeiro):
+      - enquanto não se sabe, manda dois pedidos juntos e espera a 2ª resposta
+        por no máximo PIPELINE_PROBE_TIMEOUT (as outras leituras não têm timeout:
+        uma resposta lenta não é uma conexão perdida)
+      - se ela vier, os próximos pedidos vão todos de uma vez (HTTP/1.1 pipelining)
+      - se não, a conexão é refeita e os pedidos vão um por vez
+
+    se o servidor fechar a conexão ("Connection: close" ou queda no meio do lote),
+    ela é refeita e só os pedidos ainda sem resposta são enviados de novo
+    (GETs podem ser repetidos sem efeito); desiste depois de MAX_RECONNECTS
+    quedas seguidas sem nenhuma resposta nova
     """
-    # construir request HTTP/1.1 com keep-alive
-    request_lines = [
-        f"GET {path} HTTP/1.1",
-        f"Host: {host}",
-        "Connection: keep-alive",
-        "",  # linha em branco para terminar o cabeçalho
-        ""  # corpo vazio
-    ]
-    request_data = "\r\n".join(request_lines)
+    template = conn.request_template
+    results = [None] * len(paths)
+    next_idx = 0  # as respostas chegam em ordem: paths[:next_idx] já foram respondidos
+    failures = 0
+
+    while next_idx < len(paths):
+        if conn.pipelining:
+            pending = paths[next_idx:]
+        elif conn.pipelining is None:
+            pending = paths[next_idx:next_idx + 2]
+        else:
+            pending = paths[next_idx:next_idx + 1]
+        probing = conn.pipelining is None and len(pending) == 2
 
-    try:
-        sock.sendall(request_data.encode("utf-8"))
-        print(f"Requisição GET {path} enviada.")
-    except Exception as e:
-        print(f"Erro ao enviar requisição {path}: {e}")
-        return None
-
-    # ler a resposta HTTP do socket 
-    # ler cabeçalho linha a linha até achar linha vazia
-    response_header = b""
-    while True:
         try:
-            chunk = sock.recv(1)
-            if not chunk:
-                # conexão fechada?
-                print("Conexão fechada pelo servidor enquanto recebia o cabeçalho.")
-                return None
-            response_header += chunk
-            # verificar se chegamos ao fim do cabeçalho
-            if b"\r\n\r\n" in response_header:
+            if conn.must_reconnect:
+                log.debug("Reconectando ao servidor...")
+                conn.reconnect()
+            conn.sock.sendall(b"".join(template % path.encode("ascii") for path in pending))
+            log.debug("%d requisições GET enviadas.", len(pending))
+            for i in range(len(pending)):
+                if probing and i == 1:
+                    conn.sock.settimeout(PIPELINE_PROBE_TIMEOUT)
+                results[next_idx], keep_alive = read_response(conn)
+                next_idx += 1
+                failures = 0
+                if probing and i == 1:
+                    log.debug("O servidor responde requisições em pipeline.")
+                    conn.pipelining = True
+                    conn.sock.settimeout(None)
+                if not keep_alive:
+                    # o servidor vai fechar a conexão: o resto vai numa conexão nova
+                    conn.must_reconnect = True
+                    break
+        except socket.timeout:
+            # só a espera pela 2ª resposta do teste tem timeout: a 1ª resposta
+            # veio e a 2ª não, então o servidor não faz pipelining
+            conn.must_reconnect = True
+            log.debug("O servidor não responde requisições em pipeline.")
+        except OSError as e:  # conexão fechada (EOF) ou resetada pelo servidor
+            conn.must_reconnect = True
+            failures += 1
+            log.warning("Erro na conexão: %s", e)
+            if failures > MAX_RECONNECTS:
+                log.error("Desistindo após %d quedas de conexão seguidas.", failures)
                 break
-        except Exception as e:
-            print(f"Erro ao receber dados do socket: {e}")
-            return None
 
-    # dividir cabeçalho e resto (caso tenha lido algo do body por engano)
-    parts = response_header.split(b"\r\n\r\n", 1)
-    header_part = parts[0].decode("utf-8", errors="replace")
-    body_already = parts[1] if len(parts) > 1 else b""
+        if probing and conn.pipelining is None:
+            conn.pipelining = False
 
-    # analisar status code
-    first_line = header_part.split("\r\n")[0]
-    if "200" not in first_line:
-        print(f"Resposta HTTP não é 200: {first_line}")
-        return None
-
-    # achar Content-Length
-    content_length = 0
-    lines = header_part.split("\r\n")
-    for ln in lines[1:]:
-        if ln.lower().startswith("content-length:"):
-            # pegar valor
-            parts_len = ln.split(":", 1)
-            if len(parts_len) == 2:
-                try:
-                    content_length = int(parts_len[1].strip())
-                    print(f"Content-Length: {content_length}")
-                except:
-                    print("Falha ao interpretar Content-Length.")
-            break
+    return results
 
-    # ler exatamente content_length - len(body_already) bytes adicionais
-    body = body_already
-    to_read = content_length - len(body_already)
-    while to_read > 0:
-        try:
-            chunk = sock.recv(to_read)
-            if not chunk:
-                print("Conexão fechada pelo servidor antes de receber todo o corpo.")
-                break
-            body += chunk
-            to_read -= len(chunk)
-        except Exception as e:
-            print(f"Erro ao receber o corpo da resposta: {e}")
-            return None
+def read_response(conn):
+    """
+    lê uma resposta HTTP da conexão 'conn' e retorna (corpo, keep_alive):
+      - corpo: bytes, ou None se o status for diferente de 200
+      - keep_alive: False se o servidor vai fechar a conexão depois desta resposta
+    o corpo é sempre consumido, para não atrapalhar a próxima resposta
+    levanta ConnectionError se a conexão for fechada no meio da resposta
+    """
+    # ler o cabeçalho do buffer da conexão (recv em blocos, não byte a byte)
+    response_header = conn.read_until(b"\r\n\r\n")
+    if response_header is None:
+        raise ConnectionError("conexão fechada pelo servidor enquanto recebia o cabeçalho")
+
+    # achar Content-Length direto nos bytes do cabeçalho
+    m = CONTENT_LENGTH_RE.search(response_header)
+    content_length = int(m.group(1)) if m else 0
+    if m:
+        log.debug("Content-Length: %d", content_length)
+
+    # ler exatamente content_length bytes (o que sobrar fica no buffer da conexão)
+    body = conn.read_exact(content_length)
+    if len(body) < content_length:
+        raise ConnectionError("conexão fechada pelo servidor antes de receber todo o corpo")
+
+    # HTTP/1.1 mantém a conexão, salvo "Connection: close";
+    # HTTP/1.0 só mantém com "Connection: keep-alive"
+    m = STATUS_RE.match(response_header)
+    tokens = {token.strip().lower()
+              for value in CONNECTION_RE.findall(response_header)
+              for token in value.split(b",")}
+    if b"close" in tokens:
+        keep_alive = False
+    else:
+        keep_alive = (m is not None and m.group(1) == b"1") or b"keep-alive" in tokens
+
+    # analisar status code
+    if not m or m.group(2) != b"200":
+        first_line = response_header.split(b"\r\n", 1)[0]
+        log.warning("Resposta HTTP não é 200: %s", first_line.decode("utf-8", errors="replace"))
+        return None, keep_alive
 
-    print(f"Corpo da resposta recebido: {len(body)} bytes.")
-    return body.decode("utf-8", errors="replace")
+    log.debug("Corpo da resposta recebido: %d bytes.", len(body))
+    return body, keep_alive
 
-def analysis_immortals(sock, host, port, game_ids):
+def analysis_immortals(conn, game_ids, writer):
     """
     recebe a lista dos game_ids do top 100 de 'ships_sunk'
     para cada game_id, faz GET /api/game/<id> e extrai:
       - auth
       - ships_sunk
     agrupa por auth, contando quantos jogos aparecem e qual a média de ships_sunk
-    retorna as linhas CSV 
+    escreve as linhas CSV em 'writer' (csv.writer)
     """
-    print("Iniciando Análise 1: Agrupamento por 'auth' e cálculo de médias.")
-    gas_data = {}  # dict: auth -> { "count": x, "sum_sunk": y }
+    log.info("Iniciando Análise 1: Agrupamento por 'auth' e cálculo de médias.")
+    gas_data = defaultdict(lambda: [0, 0.0])  # dict: auth -> [count, sum_sunk]
 
-    for idx, g_id in enumerate(game_ids, 1):
-        print(f"Processando game_id {idx}/{len(game_ids)}: {g_id}")
-        info = get_game_info(sock, host, port, g_id)
+    for idx, g_id, info in iter_games_info(conn, game_ids):
+        log.debug("Processando game_id %d/%d: %s", idx, len(game_ids), g_id)
+        if idx % PROGRESS_EVERY == 0:
+            log.info("Progresso: %d/%d game_ids processados.", idx, len(game_ids))
         if not info:
-            print(f"Falha ao obter informações do game_id {g_id}.")
+            log.warning("Falha ao obter informações do game_id %s.", g_id)
             continue
 
         game_stats = info.get("game_stats", {})
@@ -232,55 +386,64 @@ def analysis_immortals(sock, host, port, game_ids):
         auth = game_stats.get("auth", "UnknownAuth")
         ships_sunk = game_stats.get("ships_sunk", 0)
 
-        if auth not in gas_data:
-            gas_data[auth] = {"count": 0, "sum_sunk": 0.0}
-
-        gas_data[auth]["count"] += 1
-        gas_data[auth]["sum_sunk"] += ships_sunk
+        entry = gas_data[auth]
+        entry[0] += 1
+        entry[1] += ships_sunk
 
     # montar a lista (auth, count, average_sunk) e ordenar
     result_list = []
-    for auth, vals in gas_data.items():
-        c = vals["count"]
-        s = vals["sum_sunk"]
+    for auth, (c, s) in gas_data.items():
         avg_sunk = s / c if c > 0 else 0
         result_list.append((auth, c, avg_sunk))
 
     # ordenar por c desc 
     result_list.sort(key=lambda x: x[1], reverse=True)
 
-    # gerar CSV
+    # escrever CSV
     # <auth>,<num_jogos>,<media_sunk>
-    lines = []
-    for (auth, c, avg) in result_list:
-        # Remover vírgulas do 'auth' para não quebrar o CSV
-        auth_clean = auth.replace(",", "")
-        line = f"{auth_clean},{c},{avg:.2f}"
-        lines.append(line)
+    # Remover vírgulas e quebras de linha do 'auth' para não quebrar o CSV
+    writer.writerows((auth.replace(",", "").replace("\r", "").replace("\n", ""), c, f"{avg:.2f}")
+                     for (auth, c, avg) in result_list)
 
-    print("Análise 1 concluída.")
-    return lines
+    log.info("Análise 1 concluída.")
 
-def get_game_info(sock, host, port, game_id):
+def get_games_info(conn, game_ids):
     """
-    faz GET /api/game/<game_id>, retorna JSON em py ou None se erro
+    faz GET /api/game/<game_id> para cada id de 'game_ids' em pipeline
+    retorna uma lista, na mesma ordem, com o JSON em py ou None se erro
     """
-    path = f"/api/game/{game_id}"
-    print(f"Solicitando informações para game_id {game_id}...")
-    data = http_get(sock, host, port, path)
-    if not data:
-        print(f"Falha ao obter dados para game_id {game_id}.")
-        return None
-    try:
-        parsed = json.loads(data)
-        print(f"Informações obtidas para game_id {game_id}.")
-        return parsed
-    except json.JSONDecodeError:
-        print(f"Erro ao decodificar JSON para game_id {game_id}.")
-        return None
+    paths = [f"/api/game/{game_id}" for game_id in game_ids]
+    # só pede ao servidor os jogos que ainda não estão no cache
+    missing = [(game_id, path) for game_id, path in zip(game_ids, paths)
+               if path not in _path_cache]
+    log.debug("Solicitando informações para %d game_ids...", len(missing))
+    if missing:
+        bodies = http_pipeline(conn, [path for _, path in missing])
+        for (game_id, path), data in zip(missing, bodies):
+            if not data:
+                log.warning("Falha ao obter dados para game_id %s.", game_id)
+                continue
+            try:
+                _path_cache[path] = json_loads(data)
+                log.debug("Informações obtidas para game_id %s.", game_id)
+            except json.JSONDecodeError:
+                log.warning("Erro ao decodificar JSON para game_id %s.", game_id)
+
+    results = [_path_cache.get(path) for path in paths]
+    return results
+
+def iter_games_info(conn, game_ids):
+    """
+    percorre 'game_ids' em lotes de PIPELINE_BATCH, gerando (idx, game_id, info)
+    """
+    for batch_start in range(0, len(game_ids), PIPELINE_BATCH):
+        batch = game_ids[batch_start:batch_start + PIPELINE_BATCH]
+        infos = get_games_info(conn, batch)
+        for idx, (g_id, info) in enumerate(zip(batch, infos), batch_start + 1):
+            yield idx, g_id, info
 
 # ANÁLISE 2: Top Meta 
-def analysis_top_meta(sock, host, port, game_ids):
+def analysis_top_meta(conn, game_ids, writer):
     """
     recebe a lista dos game_ids do top 100 de 'ships_escaped'
     para cada game_id, faz GET /api/game/<id> e extrai:
@@ -288,70 +451,61 @@ def analysis_top_meta(sock, host, port, game_ids):
       - ships_escaped
     normaliza o cannon placement em um string de 8 dígitos
     agrupa por essa string e faz a média de ships_escaped
-    retorna as linhas CSV sem cabeçalho
+    escreve as linhas CSV, sem cabeçalho, em 'writer' (csv.writer)
     """
-    print("Iniciando Análise 2: Cannon Placement e cálculo de médias de 'ships_escaped'.")
-    placement_data = {}   # dict: placement_str -> {"count": x, "sum_escaped": y}
+    log.info("Iniciando Análise 2: Cannon Placement e cálculo de médias de 'ships_escaped'.")
+    placement_data = defaultdict(lambda: [0, 0])   # dict: placement_str -> [count, sum_escaped]
 
-    for idx, g_id in enumerate(game_ids, 1):
-        print(f"Processando game_id {idx}/{len(game_ids)}: {g_id}")
-        info = get_game_info(sock, host, port, g_id)
+    for idx, g_id, info in iter_games_info(conn, game_ids):
+        log.debug("Processando game_id %d/%d: %s", idx, len(game_ids), g_id)
+        if idx % PROGRESS_EVERY == 0:
+            log.info("Progresso: %d/%d game_ids processados.", idx, len(game_ids))
         if not info:
-            print(f"Falha ao obter informações do game_id {g_id}.")
+            log.warning("Falha ao obter informações do game_id %s.", g_id)
             continue
 
         game_stats = info.get("game_stats", {})
         cannons = game_stats.get("cannons", []) 
         ships_escaped = game_stats.get("ships_escaped", 0)
 
-        # contar canhões por row
-        row_counters = {}
+        # contar canhões por row direto numa lista (rows fora de 0..7 são ignoradas)
+        row_counts = [0]*8
         for cpos in cannons:
             if not isinstance(cpos, list) or len(cpos) < 2:
                 continue
             row_idx = cpos[0]
-            row_counters[row_idx] = row_counters.get(row_idx, 0) + 1
-
-        row_counts = [0]*8
-        for r in range(8):
-            row_counts[r] = row_counters.get(r, 0)
+            # 'in range(8)' compara por igualdade, então 3.0 conta como a row 3
+            # (e 3.5 ou "3" são ignorados), como no lookup por dict
+            if row_idx in BOARD_ROWS:
+                row_counts[int(row_idx)] += 1
 
         # "Histograma" de row_counts
         hist = [0]*8  # hist[i] = quantas rows têm i canhões
         for c in row_counts:
-            if 0 <= c <= 7:
-                hist[c] += 1
-            else:
-                # se por acaso tem mais que 7 canhões, agrupa em 7
-                hist[7] += 1
+            # se por acaso tem mais que 7 canhões, agrupa em 7
+            hist[c if c < 7 else 7] += 1
 
         # converter hist em string de 8 dígitos
-        placement_str = "".join(str(x) for x in hist)
-
-        if placement_str not in placement_data:
-            placement_data[placement_str] = {"count": 0, "sum_escaped": 0}
+        placement_str = "".join(map(str, hist))
 
-        placement_data[placement_str]["count"] += 1
-        placement_data[placement_str]["sum_escaped"] += ships_escaped
+        entry = placement_data[placement_str]
+        entry[0] += 1
+        entry[1] += ships_escaped
 
     # montar lista e ordenar por media_escaped asc
     result_list = []
-    for placement_str, vals in placement_data.items():
-        c = vals["count"]
-        s = vals["sum_escaped"]
+    for placement_str, (c, s) in placement_data.items():
         avg_escaped = s / c if c > 0 else 0
         result_list.append((placement_str, avg_escaped))
 
     # ordenar por avg_escaped crescente
     result_list.sort(key=lambda x: x[1])
 
-    lines = []
-    for (placement_str, avg) in result_list:
-        line = f"{placement_str},{avg:.2f}"
-        lines.append(line)
+    # escrever CSV
+    # <placement>,<media_escaped>
+    writer.writerows((placement_str, f"{avg:.2f}") for (placement_str, avg) in result_list)
 
-    print("Análise 2 concluída.")
-    return lines
+    log.info("Análise 2 concluída.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,19 @@
+# configuração do gunicorn (lida automaticamente ao rodar `gunicorn server:app`)
+
+bind = "0.0.0.0:5000"
+
+# vários processos + threads: o trabalho em Python de cada requisição não
+# fica preso a um único GIL
+workers = 4
+worker_class = "gthread"  # suporta conexões keep-alive
+threads = 2
+
+# importa server.py (DF_SCORES, rankings e respostas pré-serializadas) uma vez
+# no processo mestre, antes do fork; os workers compartilham essa memória
+# via copy-on-write em vez de cada um carregar o scores.json
+preload_app = True
+
+# por quantos segundos uma conexão keep-alive ociosa fica aberta esperando o
+# próximo pedido (o servidor de desenvolvimento do Werkzeug fecha a conexão
+# depois de cada resposta)
+keepalive = 30
@@ -1,17 +1,28 @@
+import array
+import socket
+from functools import lru_cache
+import orjson
 import pandas as pd
 import numpy as np 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
+from werkzeug.serving import WSGIRequestHandler
 
 app = Flask(__name__)
 
 def load_scores_ndjson(file_path: str) -> pd.DataFrame:
-  df_raw = pd.read_json(file_path, lines=True)
-  
-  # usa json_normalize para criar colunas separadas a partir de df_raw["score"]
-  df_score = pd.json_normalize(df_raw["score"])
-  
-  # junta as colunas originais de df_raw (exceto 'score') com as colunas de df_score
-  df_merged = pd.concat([df_raw.drop(columns=["score"]), df_score], axis=1)
+  # lê o NDJSON numa passada só, já juntando os campos de "score" em cada registro,
+  # e monta o DataFrame uma única vez (sem read_json + json_normalize + concat)
+  records = []
+  with open(file_path, "rb") as f:
+    for line in f:
+      if not line.strip():
+        continue
+      record = orjson.loads(line)
+      record.update(record.pop("score", None) or {})
+      records.append(record)
+
+  # json_normalize mantém o achatamento de campos aninhados ("a.b") do score
+  df_merged = pd.json_normalize(records)
   
   df_merged["ships_sunk"] = df_merged["shot_received"] - df_merged["invalid_shots"]
   df_merged["ships_escaped"] = df_merged["escaped_ships"]
@@ -29,27 +40,35 @@ except FileNotFoundError:
   #  DataFrame vazio para evitar que o servidor quebre
   DF_SCORES = pd.DataFrame(columns=["game_id","ships_sunk","ships_escaped"])
 
-# DataFrames ordenados para ranking
-DF_SUNK = DF_SCORES.sort_values("ships_sunk", ascending=False).reset_index(drop=True)
-DF_ESCAPED = DF_SCORES.sort_values("ships_escaped", ascending=True).reset_index(drop=True)
-
-# índice por 'game_id' para lookup rápido no endpoint /api/game/<id>
-DF_SCORES.set_index("game_id", inplace=True, drop=False)
-
-def paginate_df(df: pd.DataFrame, limit: int, start: int) -> pd.DataFrame:
+# rankings: só os game_ids são servidos, então em vez de DataFrames ordenados
+# guardamos apenas os ids na ordem de cada ranking (cada página vira um slice)
+GAME_IDS = DF_SCORES["game_id"].to_numpy(dtype=np.int64)
+SUNK_IDS = GAME_IDS[np.argsort(-DF_SCORES["ships_sunk"].to_numpy(dtype=np.float64), kind="stable")]
+ESCAPED_IDS = GAME_IDS[np.argsort(DF_SCORES["ships_escaped"].to_numpy(dtype=np.float64), kind="stable")]
+TOTAL_GAMES = len(SUNK_IDS)
+# páginas são servidas a partir de array.array: slice + tolist() sem passar por numpy
+RANKING_IDS = {
+  "sunk": array.array("q", SUNK_IDS.tolist()),
+  "escaped": array.array("q", ESCAPED_IDS.tolist()),
+}
+
+def build_game_responses(df: pd.DataFrame) -> list:
   """
-  retorna o slice paginado do DataFrame:
-    - start é 1-based (se start=1, pega do índice 0 até limit-1)
-    - limit é a quantidade de elementos na página
+  pré-serializa o corpo de /api/game/<game_id> de cada jogo
+  os game_ids são densos (1..N), então a lista é indexada direto pelo
+  game_id (posição 0 sem uso) e o endpoint só precisa de um acesso por índice
   """
-  start_idx = start - 1
-  end_idx = start_idx + limit
-  total = len(df)
+  responses = [None] * (len(df) + 1)
+  for record in df.to_dict(orient="records"):
+    game_id = int(record.pop("game_id"))  # game_id fica fora de game_stats
+    response = {
+        "game_id": game_id,
+        "game_stats": record
+    }
+    responses[game_id] = orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY)
+  return responses
 
-  if start_idx >= total:
-    # página sem registros
-    return df.iloc[0:0]  # DataFrame vazio
-  return df.iloc[start_idx:end_idx]
+GAME_RESPONSES = build_game_responses(DF_SCORES)
 
 def build_pagination_links(ranking_type: str, limit: int, start: int, total_items: int):
   """
@@ -75,6 +94,38 @@ def build_pagination_links(ranking_type: str, limit: int, start: int, total_item
 
   return prev_link, next_link
 
+def json_response(data, status: int = 200) -> Response:
+  """
+  serializa 'data' com orjson (bem mais rápido que o json.dumps do jsonify)
+  OPT_SERIALIZE_NUMPY cobre os escalares numpy que vêm das linhas do DataFrame
+  """
+  body = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+  return Response(body, status=status, mimetype="application/json")
+
+@lru_cache(maxsize=256)
+def rank_page(ranking_type: str, limit: int, start: int) -> bytes:
+  """
+  monta o corpo JSON (já serializado) de uma página do ranking 'ranking_type'
+  os dados são imutáveis, então cada (ranking_type, limit, start) é montado
+  uma única vez e depois servido direto do cache
+  """
+  # start é 1-based; as duas pontas são limitadas a 0 para que start <= 0
+  # não "volte" do fim da lista nem repita jogos da página seguinte
+  start_idx = start - 1
+  game_ids = RANKING_IDS[ranking_type][max(0, start_idx):max(0, start_idx + limit)].tolist()
+
+  prev_link, next_link = build_pagination_links(ranking_type, limit, start, TOTAL_GAMES)
+
+  response = {
+      "ranking": ranking_type,
+      "limit": limit,
+      "start": start,
+      "games": game_ids,
+      "prev": prev_link,
+      "next": next_link
+  }
+  return orjson.dumps(response)
+
 # endpoints
 @app.route("/api/game/<int:game_id>", methods=["GET"])
 def get_game_info(game_id: int):
@@ -83,18 +134,10 @@ def get_game_info(game_id: int):
       - recupera as informações do jogo cujo ID é <game_id>
       - se não encontrar, retorna 404
     """
-    if game_id not in DF_SCORES.index:
-        return jsonify({"error": "Game not found"}), 404
-    
-    row = DF_SCORES.loc[game_id]  # recupera linha (Series)
-    game_dict = row.to_dict()
-    game_dict.pop("game_id", None)  # remove a chave game_id de dentro de game_stats
+    if not 1 <= game_id <= TOTAL_GAMES:
+        return json_response({"error": "Game not found"}, 404)
 
-    response = {
-        "game_id": game_id,
-        "game_stats": game_dict
-    }
-    return jsonify(response), 200
+    return Response(GAME_RESPONSES[game_id], status=200, mimetype="application/json")
 
 
 @app.route("/api/rank/sunk", methods=["GET"])
@@ -108,26 +151,12 @@ def get_rank_sunk():
         limit = int(request.args.get("limit", 10))
         start = int(request.args.get("start", 1))
     except ValueError:
-        return jsonify({"error": "parametros 'limit' e 'start' devem ser inteiros"}), 400
+        return json_response({"error": "parametros 'limit' e 'start' devem ser inteiros"}, 400)
 
     if limit < 1 or limit > 50:
-        return jsonify({"error": "'limit' deve estar entre 1 e 50"}), 400
-
-    total_games = len(DF_SUNK)
-    page_df = paginate_df(DF_SUNK, limit, start)
-    game_ids = page_df["game_id"].tolist()
-
-    prev_link, next_link = build_pagination_links("sunk", limit, start, total_games)
+        return json_response({"error": "'limit' deve estar entre 1 e 50"}, 400)
 
-    response = {
-        "ranking": "sunk",
-        "limit": limit,
-        "start": start,
-        "games": game_ids,
-        "prev": prev_link,
-        "next": next_link
-    }
-    return jsonify(response), 200
+    return Response(rank_page("sunk", limit, start), status=200, mimetype="application/json")
 
 
 @app.route("/api/rank/escaped", methods=["GET"])
@@ -141,26 +170,22 @@ def get_rank_escaped():
         limit = int(request.args.get("limit", 10))
         start = int(request.args.get("start", 1))
     except ValueError:
-        return jsonify({"error": "parametros 'limit' e 'start' devem ser inteiros"}), 400
+        return json_response({"error": "parametros 'limit' e 'start' devem ser inteiros"}, 400)
 
     if limit < 1 or limit > 50:
-        return jsonify({"error": "'limit' deve estar entre 1 e 50"}), 400
+        return json_response({"error": "'limit' deve estar entre 1 e 50"}, 400)
 
-    total_games = len(DF_ESCAPED)
-    page_df = paginate_df(DF_ESCAPED, limit, start)
-    game_ids = page_df["game_id"].tolist()
+    return Response(rank_page("escaped", limit, start), status=200, mimetype="application/json")
 
-    prev_link, next_link = build_pagination_links("escaped", limit, start, total_games)
-
-    response = {
-        "ranking": "escaped",
-        "limit": limit,
-        "start": start,
-        "games": game_ids,
-        "prev": prev_link,
-        "next": next_link
-    }
-    return jsonify(response), 200
+class NoDelayRequestHandler(WSGIRequestHandler):
+    """
+    desativa o algoritmo de Nagle (TCP_NODELAY) em cada conexão aceita,
+    para que as respostas pequenas da API não fiquem esperando no buffer
+    """
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True, threaded=True)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=5000, debug=False, threaded=True,
+            request_handler=NoDelayRequestHandler)
\ No newline at end of file